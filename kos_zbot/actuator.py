@@ -2,6 +2,7 @@ import threading
 import time
 from kos_zbot.feetech import *
 from typing import Dict, Optional
+import numpy as np
 import os
 import sched
 import platform
@@ -21,6 +22,9 @@ class NoActuatorsFoundError(Exception):
 ADDR_KP = 21  # Speed loop P gain
 ADDR_KD = 22  # Speed loop D gain
 
+COUNTS_PER_DEGREE = 4096 / 360  # 12-bit encoder over one revolution
+DEGREES_PER_COUNT = 360 / 4096
+
 
 servoRegs = [
     {"name": "Model", "addr": SMS_STS_MODEL_L, "size": 2, "type": "uint16"},
@@ -162,6 +166,9 @@ class SCSMotorController:
         self.actuator_ids = (
             set()
         )  # Use set instead of list for efficient membership testing
+        self.sorted_actuator_ids = ()  # Rebuilt on add/remove, not per request
+        # Registered-ID bitmap indexed by actuator ID (bus IDs are 0-253, 255 stays False)
+        self._registered_lut = np.zeros(256, dtype=bool)
         self.last_commanded_positions = {}
         self.next_position_batch = None  # Atomic batch update
         self.last_commanded_velocities = {}
@@ -276,6 +283,15 @@ class SCSMotorController:
         else:
             self.log.warning("No robot metadata available. Running without limit enforcement.")
 
+        # Per-ID angle limits for the vectorized command path (IDs are 0-253)
+        self._min_angle_lut = np.full(256, -np.inf)
+        self._max_angle_lut = np.full(256, np.inf)
+        for actuator_id, limits in self.actuator_limits.items():
+            if limits['min_angle_deg'] is not None:
+                self._min_angle_lut[actuator_id] = limits['min_angle_deg']
+            if limits['max_angle_deg'] is not None:
+                self._max_angle_lut[actuator_id] = limits['max_angle_deg']
+
         with self._control_lock:
             for actuator in available_actuators:
                 self._add_actuator(actuator["id"])
@@ -320,6 +336,8 @@ class SCSMotorController:
 
         # Initialize position tracking
         self.actuator_ids.add(actuator_id)
+        self.sorted_actuator_ids = tuple(sorted(self.actuator_ids))
+        self._registered_lut[actuator_id] = True
         self.last_commanded_positions[actuator_id] = 0
         self.last_commanded_velocities[actuator_id] = 0
 
@@ -336,6 +354,8 @@ class SCSMotorController:
             self.torque_enabled_ids.discard(actuator_id)
             self.commanded_ids.discard(actuator_id)
             self.actuator_ids.remove(actuator_id)
+            self.sorted_actuator_ids = tuple(sorted(self.actuator_ids))
+            self._registered_lut[actuator_id] = False
             self.last_commanded_positions.pop(actuator_id, None)
 
             # Double-buffered positions: cleanup both buffers
@@ -653,7 +673,7 @@ class SCSMotorController:
     def get_all_params(self):
         """Read and display parameters for all configured actuators"""
         self.log.info("reading parameters for all actuators")
-        for actuator_id in sorted(self.actuator_ids):
+        for actuator_id in self.sorted_actuator_ids:
             self._get_params(actuator_id)
 
     def _read_states(self, ignore_errors: bool = False):
@@ -792,11 +812,11 @@ class SCSMotorController:
 
     def _counts_to_degrees(self, counts: float, offset: float = 180.0) -> float:
         """Convert raw counts to degrees with optional offset"""
-        return (counts * 360 / 4096) - offset
+        return counts * DEGREES_PER_COUNT - offset
 
     def _degrees_to_counts(self, degrees: float, offset: float = 180.0) -> int:
         """Convert degrees to raw counts with optional offset"""
-        return int((degrees + offset) * (4096 / 360))
+        return int((degrees + offset) * COUNTS_PER_DEGREE)
 
     def set_targets(self, target_dict: Dict[int, Dict[str, float]]):
         """Set target positions and velocities for multiple actuators atomically.
@@ -826,17 +846,82 @@ class SCSMotorController:
                         position = limits['max_angle_deg']
                         self.log.warn(f"Clipped position for actuator {actuator_id} ({limits['joint_name']}) from {original_position:.2f}° to {position:.2f}° (max limit)")
 
-                self.next_position_batch[actuator_id] = self._degrees_to_counts(position, offset=180.0)
-                self.next_velocity_batch[actuator_id] = self._degrees_to_counts(targets["velocity"], offset=0.0)
+                self.next_position_batch[actuator_id] = int((position + 180.0) * COUNTS_PER_DEGREE)
+                self.next_velocity_batch[actuator_id] = int(targets["velocity"] * COUNTS_PER_DEGREE)
                 self.commanded_ids.add(actuator_id)
 
+    def set_targets_array(
+        self, ids: np.ndarray, positions: np.ndarray, velocities: np.ndarray
+    ):
+        """Vectorized set_targets() for parallel arrays of IDs and targets.
+
+        Unregistered IDs and non-finite targets are dropped, limits are clipped
+        and degrees are converted to counts in a few array operations instead
+        of per actuator.
+
+        Args:
+            ids: Actuator IDs
+            positions: Target positions in degrees
+            velocities: Target velocities in degrees/second
+
+        Returns:
+            IDs of registered actuators whose targets were dropped because they
+            were not finite
+        """
+        ids = np.asarray(ids)
+        positions = np.asarray(positions, dtype=np.float64)
+        velocities = np.asarray(velocities, dtype=np.float64)
+
+        # Out-of-range IDs (including negatives seen as huge unsigned) clip to 255
+        mask = self._registered_lut.take(ids.astype(np.uint32), mode="clip")
+
+        # NaN/inf would cast to garbage counts and move the servo, never send them
+        finite = np.isfinite(positions) & np.isfinite(velocities)
+        rejected = []
+        if not finite.all():
+            for i in np.flatnonzero(mask & ~finite).tolist():
+                rejected.append(int(ids[i]))
+                self.log.warning(
+                    f"Dropping non-finite target for actuator {int(ids[i])}: "
+                    f"position={positions[i]}, velocity={velocities[i]}"
+                )
+            mask &= finite
+
+        if not mask.all():
+            ids = ids[mask]
+            positions = positions[mask]
+            velocities = velocities[mask]
+        if ids.size == 0:
+            return rejected
+
+        # Apply angle limits
+        clipped = np.clip(positions, self._min_angle_lut[ids], self._max_angle_lut[ids])
+        if not np.array_equal(clipped, positions):
+            for i in np.flatnonzero(clipped != positions).tolist():
+                aid = int(ids[i])
+                side = "min" if clipped[i] > positions[i] else "max"
+                self.log.warning(f"Clipped position for actuator {aid} ({self.actuator_limits[aid]['joint_name']}) from {positions[i]:.2f}° to {clipped[i]:.2f}° ({side} limit)")
+
+        position_counts = ((clipped + 180.0) * COUNTS_PER_DEGREE).astype(np.int32)
+        velocity_counts = (velocities * COUNTS_PER_DEGREE).astype(np.int32)
+
+        id_list = ids.tolist()
+        with self._target_positions_lock:
+            if self.next_position_batch is None:
+                self.next_position_batch = {}
+                self.next_velocity_batch = {}
+            self.next_position_batch.update(zip(id_list, position_counts.tolist()))
+            self.next_velocity_batch.update(zip(id_list, velocity_counts.tolist()))
+            self.commanded_ids.update(id_list)
+        return rejected
+
     def get_position(self, actuator_id: int) -> Optional[float]:
         """Get current position of a specific actuator"""
         with self._positions_lock:
             positions = self._active_positions
         value = positions.get(actuator_id)
         return (
-            self._counts_to_degrees(value, offset=180.0) if value is not None else None
+            value * DEGREES_PER_COUNT - 180.0 if value is not None else None
         )
 
     def get_velocity(self, actuator_id: int) -> Optional[float]:
@@ -844,7 +929,7 @@ class SCSMotorController:
         with self._positions_lock:
             velocities = self._active_velocities
         value = velocities.get(actuator_id)
-        return self._counts_to_degrees(value, offset=0.0) if value is not None else None
+        return value * DEGREES_PER_COUNT if value is not None else None
 
     def get_state(self, actuator_id: int) -> Optional[dict]:
         """Get current position and velocity of a specific actuator"""
@@ -856,10 +941,57 @@ class SCSMotorController:
         if pos is None or vel is None:
             return None
         return {
-            "position": self._counts_to_degrees(pos, offset=180.0),
-            "velocity": self._counts_to_degrees(vel, offset=0.0),
+            "position": pos * DEGREES_PER_COUNT - 180.0,
+            "velocity": vel * DEGREES_PER_COUNT,
         }
 
+    def get_positions(self, actuator_ids) -> np.ndarray:
+        """Get current positions of several actuators in degrees (NaN if unread)"""
+        with self._positions_lock:
+            positions = self._active_positions
+        pos = np.fromiter(
+            (positions.get(aid, np.nan) for aid in actuator_ids), dtype=np.float64, count=len(actuator_ids)
+        )
+        pos *= DEGREES_PER_COUNT
+        pos -= 180.0
+        return pos
+
+    def get_velocities(self, actuator_ids) -> np.ndarray:
+        """Get current velocities of several actuators in degrees/second (NaN if unread)"""
+        with self._positions_lock:
+            velocities = self._active_velocities
+        vel = np.fromiter(
+            (velocities.get(aid, np.nan) for aid in actuator_ids), dtype=np.float64, count=len(actuator_ids)
+        )
+        vel *= DEGREES_PER_COUNT
+        return vel
+
+    def get_states(self, actuator_ids) -> tuple:
+        """Get positions and velocities for several actuators from one buffer snapshot
+
+        Args:
+            actuator_ids: Sequence of actuator IDs
+
+        Returns:
+            Tuple of (positions, velocities, valid) arrays in degrees and
+            degrees/second. Entries without a reading are NaN and not valid.
+        """
+        with self._positions_lock:
+            positions = self._active_positions
+            velocities = self._active_velocities
+        count = len(actuator_ids)
+        pos = np.fromiter(
+            (positions.get(aid, np.nan) for aid in actuator_ids), dtype=np.float64, count=count
+        )
+        vel = np.fromiter(
+            (velocities.get(aid, np.nan) for aid in actuator_ids), dtype=np.float64, count=count
+        )
+        valid = ~(np.isnan(pos) | np.isnan(vel))
+        pos *= DEGREES_PER_COUNT
+        pos -= 180.0
+        vel *= DEGREES_PER_COUNT
+        return pos, vel, valid
+
     def get_torque_enabled(self, actuator_id: int) -> bool:
         return actuator_id in self.torque_enabled_ids
 
@@ -1133,7 +1265,7 @@ class SCSMotorController:
         success = True
 
         with self._control_lock:
-            for aid in sorted(self.actuator_ids):
+            for aid in self.sorted_actuator_ids:
                 self.log.info(f"Changing baudrate for actuator {aid} to {raw_baud}")
                 # unlock EEPROM
                 self._unlockEEPROM(aid)
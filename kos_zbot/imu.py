@@ -198,6 +198,19 @@ class BNO055Manager:
                 self._buffer["calib"],
             )
 
+    def get_latest_values_into(self, accel_out, gyro_out, quat_out):
+        """Copy latest accel, gyro and quaternion into caller-owned arrays."""
+        if not self._imu_available:
+            raise IMUNotAvailableError(self._imu_error_msg or "IMU not available")
+        with self._lock:
+            accel = self._buffer["accel"]
+            gyro = self._buffer["gyro"]
+            quat = self._buffer["quat"]
+        # Buffered readings are immutable tuples, so copy outside the lock
+        accel_out[:] = accel
+        gyro_out[:] = gyro
+        quat_out[:] = quat
+
     def get_quaternion(self):
         """Get latest quaternion."""
         if not self._imu_available:
@@ -126,7 +126,8 @@ class PolicyLoop:
             return
 
         try:
-            self.policy_provider.arrays.clear()
+            self.policy_provider.reset_values()
+            self.policy_provider.tick += 1
             output, self.policy_carry = self.policy_model.step(self.policy_carry)
             self.policy_model.take_action(output)
         except Exception as e:
@@ -174,6 +175,7 @@ class PolicyLoop:
             time.sleep(1/self.rate)
         
         self.policy_carry = self.policy_model.init()
+        self.policy_provider.start_episode()
             
 
         self.log.info(f"Starting policy ({self.rate}Hz)")
@@ -1,7 +1,7 @@
 # minimal_motor_server.py
 import asyncio
 import grpc
-from concurrent import futures
+import numpy as np
 from google.protobuf import empty_pb2
 from google.protobuf.struct_pb2 import Struct
 from kos_protos import (
@@ -25,15 +25,27 @@ from kos_zbot.utils.logging import KOSLoggerSetup, get_log_level, get_logger
 import os
 import sys
 import fcntl
-import termios
 import time
+from typing import Optional
+import ctypes
+import ctypes.util
+
+log = get_logger(__name__)
+
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
 
 class ActuatorService(actuator_pb2_grpc.ActuatorServiceServicer):
     def __init__(self, actuator_controller):
         super().__init__()
         self.actuator_controller = actuator_controller
-        self.log = get_logger(__name__)
         self.temporal_lock = asyncio.Lock()
+        # Reused command buffers, filled and consumed without yielding to the loop
+        self._ids_buf = np.zeros(256, dtype=np.int32)
+        self._pos_buf = np.zeros(256, dtype=np.float64)
+        self._vel_buf = np.zeros(256, dtype=np.float64)
+        self._states_response = actuator_pb2.GetActuatorsStateResponse()
 
     async def ConfigureActuator(self, request, context):
         """Handle actuator configuration."""
@@ -62,7 +74,7 @@ class ActuatorService(actuator_pb2_grpc.ActuatorServiceServicer):
                 )
                 if not success:
                     error_msg = f"failed to configure actuator {request.actuator_id}"
-                    self.log.error(error_msg)
+                    log.error(error_msg)
                     context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
                     context.set_details(error_msg)
                     return common_pb2.ActionResponse(success=False)
@@ -76,34 +88,46 @@ class ActuatorService(actuator_pb2_grpc.ActuatorServiceServicer):
 
         except Exception as e:
             error_msg = f"error configuring actuator {request.actuator_id}: {str(e)}"
-            self.log.error(error_msg)
+            log.error(error_msg)
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(error_msg)
             return common_pb2.ActionResponse(success=False)
 
+    def _command_arrays(self, request):
+        """Unpack a CommandActuatorsRequest into the reusable id/position/velocity buffers.
+
+        Returns views of the first len(request.commands) entries. The caller
+        must consume them before its next await and must not keep them.
+        """
+        commands = request.commands
+        count = len(commands)
+        if count > self._ids_buf.size:
+            self._ids_buf = np.zeros(count, dtype=np.int32)
+            self._pos_buf = np.zeros(count, dtype=np.float64)
+            self._vel_buf = np.zeros(count, dtype=np.float64)
+        ids, positions, velocities = self._ids_buf, self._pos_buf, self._vel_buf
+        for i, cmd in enumerate(commands):
+            ids[i] = cmd.actuator_id
+            positions[i] = cmd.position
+            velocities[i] = cmd.velocity  # An unset optional velocity reads back as 0.0
+        return ids[:count], positions[:count], velocities[:count]
+
     async def CommandActuators(self, request, context):
         """Handle multiple actuator commands atomically."""
         try:
-            async with self.temporal_lock:
-                commands = [
-                    {
-                        "actuator_id": cmd.actuator_id,
-                        "position": cmd.position,
-                        "velocity": cmd.velocity if cmd.HasField("velocity") else 0.0,
-                    }
-                    for cmd in request.commands
-                ]
-                servo_commands = {
-                    cmd["actuator_id"]: {
-                        "position": cmd["position"],
-                        "velocity": cmd["velocity"],
-                    }
-                    for cmd in commands
-                    if cmd["actuator_id"] in self.actuator_controller.actuator_ids
-                }
-                self.actuator_controller.set_targets(servo_commands)
-
-                return actuator_pb2.CommandActuatorsResponse()
+            # No await between unpacking and set_targets_array, so the shared
+            # buffers cannot be touched by another handler mid-update
+            ids, positions, velocities = self._command_arrays(request)
+            rejected = self.actuator_controller.set_targets_array(
+                ids, positions, velocities
+            )
+            if rejected:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(
+                    f"Non-finite position or velocity for actuators {rejected}"
+                )
+
+            return actuator_pb2.CommandActuatorsResponse()
 
         except RuntimeError:
             context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
@@ -124,30 +148,42 @@ class ActuatorService(actuator_pb2_grpc.ActuatorServiceServicer):
             return s
 
         try:
-            ids = request.actuator_ids or sorted(self.actuator_controller.actuator_ids)
-            result = []
-            self.log.info(f"ParameterDump request: {ids}")
+            ids = request.actuator_ids or self.actuator_controller.sorted_actuator_ids
+            log.info(f"ParameterDump request: {ids}")
+            valid_ids = []
             for aid in ids:
                 if aid not in self.actuator_controller.actuator_ids:
-                    self.log.warning(f"actuator {aid} not registered")
+                    log.warning(f"actuator {aid} not registered")
                     continue  # Skip unregistered actuators
-                try:
-                    param_dict = self.actuator_controller.read_all_servo_params(aid)
-                    result.append(
-                        actuator_pb2.ParameterDumpEntry(
-                            actuator_id=aid, parameters=dict_to_struct(param_dict)
+                valid_ids.append(aid)
+
+            def read_entries():
+                # The controller takes the control lock per actuator, so the
+                # update loop keeps ticking between servos
+                entries = []
+                for aid in valid_ids:
+                    try:
+                        param_dict = self.actuator_controller.read_all_servo_params(aid)
+                        if param_dict is None:
+                            raise RuntimeError("read failed")
+                        entries.append(
+                            actuator_pb2.ParameterDumpEntry(
+                                actuator_id=aid, parameters=dict_to_struct(param_dict)
+                            )
                         )
-                    )
-                except Exception as e:
-                    self.log.warning(
-                        f"failed to read parameters from actuator {aid}: {e}"
-                    )
-                    continue  # Skip on failure
+                    except Exception as e:
+                        log.warning(f"failed to read parameters from actuator {aid}: {e}")
+                        continue  # Skip on failure
+                return entries
+
+            # Serial reads block, so run the whole dump off the event loop
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, read_entries)
 
             return actuator_pb2.ParameterDumpResponse(entries=result)
 
         except Exception as e:
-            self.log.error(f"failed to handle GetParameters: {e}")
+            log.error(f"failed to handle GetParameters: {e}")
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             return actuator_pb2.ParameterDumpResponse()
@@ -157,14 +193,22 @@ class ActuatorService(actuator_pb2_grpc.ActuatorServiceServicer):
         try:
             # If no IDs or 0 is in the list, return all
             if not request.actuator_ids:
-                ids = sorted(self.actuator_controller.actuator_ids)
+                ids = self.actuator_controller.sorted_actuator_ids
             else:
                 ids = request.actuator_ids
 
-            states = []
-            for actuator_id in ids:
+            # Reuse one response message; grpc serializes it before this
+            # handler yields back to the event loop
+            response = self._states_response
+            response.Clear()
+            states = response.states
+            positions, velocities, valid = self.actuator_controller.get_states(ids)
+            positions = positions.tolist()
+            velocities = velocities.tolist()
+            valid = valid.tolist()
+            for i, actuator_id in enumerate(ids):
                 if actuator_id not in self.actuator_controller.actuator_ids:
-                    state = actuator_pb2.ActuatorStateResponse(
+                    states.add(
                         actuator_id=actuator_id,
                         position=0.0,
                         velocity=0.0,
@@ -172,49 +216,39 @@ class ActuatorService(actuator_pb2_grpc.ActuatorServiceServicer):
                         torque_enabled=False,
                         faults=["servo not registered"],
                     )
-                    states.append(state)
                     continue
 
                 torque_enabled = self.actuator_controller.get_torque_enabled(actuator_id)
-                state_dict = self.actuator_controller.get_state(actuator_id)
                 fault_info = self.actuator_controller.get_faults(actuator_id)
                 limits = self.actuator_controller.get_limits(actuator_id)
-                if fault_info is None:
-                    faults = []
-                else:
-                    faults = [
-                        str(fault_info["last_fault_message"]),
-                        str(fault_info["total_faults"]),
-                        str(int(fault_info["last_fault_time"])),  # as integer timestamp
-                    ]
-
-                if state_dict is None:
-                    state = actuator_pb2.ActuatorStateResponse(
-                        actuator_id=actuator_id,
-                        position=0.0,
-                        velocity=0.0,
-                        online=False,
-                        faults=faults,
-                    )
+
+                # Build each state in place inside the repeated field
+                state = states.add(actuator_id=actuator_id)
+                if not valid[i]:
+                    state.position = 0.0
+                    state.velocity = 0.0
+                    state.online = False
                 else:
-                    state_kwargs = {
-                        "actuator_id": actuator_id,
-                        "position": state_dict.get("position", 0.0),
-                        "velocity": state_dict.get("velocity", 0.0),
-                        "online": torque_enabled,
-                        "torque_enabled": torque_enabled,
-                        "faults": faults,
-                    }
+                    state.position = positions[i]
+                    state.velocity = velocities[i]
+                    state.online = torque_enabled
+                    state.torque_enabled = torque_enabled
                     if limits:
                         if limits["min_position"] is not None:
-                            state_kwargs["min_position"] = limits["min_position"]
+                            state.min_position = limits["min_position"]
                         if limits["max_position"] is not None:
-                            state_kwargs["max_position"] = limits["max_position"]
-                    
-                    state = actuator_pb2.ActuatorStateResponse(**state_kwargs)
+                            state.max_position = limits["max_position"]
+
+                if fault_info is not None:
+                    state.faults.extend(
+                        (
+                            str(fault_info["last_fault_message"]),
+                            str(fault_info["total_faults"]),
+                            str(int(fault_info["last_fault_time"])),  # as integer timestamp
+                        )
+                    )
 
-                states.append(state)
-            return actuator_pb2.GetActuatorsStateResponse(states=states)
+            return response
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
@@ -226,7 +260,12 @@ class IMUService(imu_pb2_grpc.IMUServiceServicer):
 
     def __init__(self, imu_manager):
         self.imu = imu_manager
-        self.log = get_logger(__name__)
+        # Success responses are reused; grpc serializes each one before the
+        # handler yields, so the next call cannot overwrite it in flight
+        self._values_resp = imu_pb2.IMUValuesResponse()
+        self._quat_resp = imu_pb2.QuaternionResponse()
+        self._euler_resp = imu_pb2.EulerAnglesResponse()
+        self._advanced_resp = imu_pb2.IMUAdvancedValuesResponse()
 
     def __del__(self):
         """Ensure cleanup of IMU manager."""
@@ -239,17 +278,13 @@ class IMUService(imu_pb2_grpc.IMUServiceServicer):
         """Implements GetValues by reading IMU sensor data."""
         try:
             accel, gyro, mag = self.imu.get_values()
-            return imu_pb2.IMUValuesResponse(
-                accel_x=float(accel[0]),
-                accel_y=float(accel[1]),
-                accel_z=float(accel[2]),
-                gyro_x=float(gyro[0]),
-                gyro_y=float(gyro[1]),
-                gyro_z=float(gyro[2]),
-                mag_x=float(mag[0]),
-                mag_y=float(mag[1]),
-                mag_z=float(mag[2]),
-            )
+            resp = self._values_resp
+            # The manager only buffers fully numeric 3-tuples, which the float
+            # fields accept as-is, so unpack straight into the setters
+            resp.accel_x, resp.accel_y, resp.accel_z = accel
+            resp.gyro_x, resp.gyro_y, resp.gyro_z = gyro
+            resp.mag_x, resp.mag_y, resp.mag_z = mag
+            return resp
         except IMUNotAvailableError as e:
             context.set_code(grpc.StatusCode.UNAVAILABLE)
             context.set_details(str(e))
@@ -265,9 +300,12 @@ class IMUService(imu_pb2_grpc.IMUServiceServicer):
         """Implements GetQuaternion by reading orientation data."""
         try:
             w, x, y, z = self.imu.get_quaternion()
-            return imu_pb2.QuaternionResponse(
-                w=float(w), x=float(x), y=float(y), z=float(z)
-            )
+            resp = self._quat_resp
+            resp.w = float(w)
+            resp.x = float(x)
+            resp.y = float(y)
+            resp.z = float(z)
+            return resp
         except IMUNotAvailableError as e:
             context.set_code(grpc.StatusCode.UNAVAILABLE)
             context.set_details(str(e))
@@ -283,9 +321,11 @@ class IMUService(imu_pb2_grpc.IMUServiceServicer):
         """Implements GetEuler by reading Euler angles directly from sensor."""
         try:
             roll, pitch, yaw = self.imu.get_euler()
-            return imu_pb2.EulerAnglesResponse(
-                roll=float(roll), pitch=float(pitch), yaw=float(yaw)
-            )
+            resp = self._euler_resp
+            resp.roll = float(roll)
+            resp.pitch = float(pitch)
+            resp.yaw = float(yaw)
+            return resp
         except IMUNotAvailableError as e:
             context.set_code(grpc.StatusCode.UNAVAILABLE)
             context.set_details(str(e))
@@ -301,15 +341,15 @@ class IMUService(imu_pb2_grpc.IMUServiceServicer):
         """Implements GetAdvancedValues by reading extended sensor data."""
         try:
             lin_accel, gravity, temp = self.imu.get_advanced_values()
-            return imu_pb2.IMUAdvancedValuesResponse(
-                lin_acc_x=float(lin_accel[0]),
-                lin_acc_y=float(lin_accel[1]),
-                lin_acc_z=float(lin_accel[2]),
-                grav_x=float(gravity[0]),
-                grav_y=float(gravity[1]),
-                grav_z=float(gravity[2]),
-                temp=float(temp),
-            )
+            resp = self._advanced_resp
+            resp.lin_acc_x = float(lin_accel[0])
+            resp.lin_acc_y = float(lin_accel[1])
+            resp.lin_acc_z = float(lin_accel[2])
+            resp.grav_x = float(gravity[0])
+            resp.grav_y = float(gravity[1])
+            resp.grav_z = float(gravity[2])
+            resp.temp = float(temp)
+            return resp
         except IMUNotAvailableError as e:
             context.set_code(grpc.StatusCode.UNAVAILABLE)
             context.set_details(str(e))
@@ -361,7 +401,6 @@ class PolicyService(policy_pb2_grpc.PolicyServiceServicer):
     def __init__(self, policy_manager: PolicyManager):
         super().__init__()
         self.policy_manager = policy_manager
-        self.log = get_logger(__name__)
 
     async def StartPolicy(self, request: policy_pb2.StartPolicyRequest, context):
         """Start policy deployment."""
@@ -392,19 +431,24 @@ class PolicyService(policy_pb2_grpc.PolicyServiceServicer):
         """Get current policy state."""
         try:
             state = await self.policy_manager.get_state()
-            # Ensure all values are strings
-            string_state = {k: str(v) for k, v in state.items()}
-            return policy_pb2.GetStateResponse(state=string_state)
+            response = policy_pb2.GetStateResponse()
+            response.state.update(state)
+            return response
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             return policy_pb2.GetStateResponse()
 
 
-async def serve(host: str = "0.0.0.0", port: int = 50051):
-    """Start the gRPC server."""
-    log = get_logger(__name__)
-    server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10))
+async def serve(
+    host: str = "0.0.0.0", port: int = 50051, unix_socket: Optional[str] = None
+):
+    """Start the gRPC server.
+
+    Listens on TCP for remote clients and, if unix_socket is set, also on a
+    Unix domain socket so on-robot clients can skip the loopback TCP stack.
+    """
+    server = grpc.aio.server()
 
     metadata = None
     metadata_manager = RobotMetadata.get_instance()
@@ -456,8 +500,17 @@ async def serve(host: str = "0.0.0.0", port: int = 50051):
         policy_pb2_grpc.add_PolicyServiceServicer_to_server(policy_service, server)
 
         server.add_insecure_port(f"{host}:{port}")
+        if unix_socket:
+            try:
+                server.add_insecure_port(f"unix:{unix_socket}")
+            except RuntimeError as e:
+                # The socket is optional, so a stale file must not take TCP down
+                log.warning(f"Could not bind unix:{unix_socket}, serving TCP only: {e}")
+                unix_socket = None
         await server.start()
         log.info(f"KOS ZBot service started on {host}:{port}")
+        if unix_socket:
+            log.info(f"KOS ZBot service listening on unix:{unix_socket}")
         await stop_event.wait()
         await policy_manager.stop_policy()
         await server.stop(1)
@@ -467,51 +520,53 @@ async def serve(host: str = "0.0.0.0", port: int = 50051):
         imu_manager.stop()
 
 
+def _handle_existing(pidfile_fd, pidfile):
+    """Resolve a held pidfile lock: prompt to stop a live process or clear a stale file."""
+    with open(pidfile, "r") as f:
+        existing_pid = f.read().strip()
+    if existing_pid and existing_pid.isdigit():
+        try:
+            os.kill(int(existing_pid), 0)
+            # Process is alive
+            answer = input(
+                f"A kos process is already running (PID: {existing_pid}). Stop it? [y/N] "
+            )
+            if answer.lower() == "y":
+                os.kill(int(existing_pid), 15)  # SIGTERM
+                log.info("Sent SIGTERM, waiting for process to exit...")
+                for _ in range(10):
+                    try:
+                        os.kill(int(existing_pid), 0)
+                        time.sleep(0.5)
+                    except OSError:
+                        break
+                else:
+                    log.info("Process did not exit, exiting.")
+                    sys.exit(1)
+                # Try to acquire lock again
+                fcntl.lockf(pidfile_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                log.info("Exiting.")
+                sys.exit(1)
+        except OSError:
+            # Process not running, remove stale pidfile
+            log.info("Stale PID file found, removing.")
+            os.remove(pidfile)
+            fcntl.lockf(pidfile_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        log.info("PID file exists but is invalid, removing.")
+        os.remove(pidfile)
+        fcntl.lockf(pidfile_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
 def singleton_check(pidfile="/tmp/kos.pid"):
     """Ensure only one kos process runs at a time."""
-    log = get_logger(__name__)
     pidfile_fd = os.open(pidfile, os.O_RDWR | os.O_CREAT, 0o644)
     try:
         fcntl.lockf(pidfile_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
     except IOError:
         # File is locked by another process
-        with open(pidfile, "r") as f:
-            existing_pid = f.read().strip()
-        if existing_pid and existing_pid.isdigit():
-            try:
-                os.kill(int(existing_pid), 0)
-                # Process is alive
-                answer = input(
-                    f"A kos process is already running (PID: {existing_pid}). Stop it? [y/N] "
-                )
-                if answer.lower() == "y":
-                    os.kill(int(existing_pid), 15)  # SIGTERM
-                    log.info("Sent SIGTERM, waiting for process to exit...")
-                    import time
-
-                    for _ in range(10):
-                        try:
-                            os.kill(int(existing_pid), 0)
-                            time.sleep(0.5)
-                        except OSError:
-                            break
-                    else:
-                        log.info("Process did not exit, exiting.")
-                        sys.exit(1)
-                    # Try to acquire lock again
-                    fcntl.lockf(pidfile_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-                else:
-                    log.info("Exiting.")
-                    sys.exit(1)
-            except OSError:
-                # Process not running, remove stale pidfile
-                log.info("Stale PID file found, removing.")
-                os.remove(pidfile)
-                fcntl.lockf(pidfile_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-        else:
-            log.info("PID file exists but is invalid, removing.")
-            os.remove(pidfile)
-            fcntl.lockf(pidfile_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        _handle_existing(pidfile_fd, pidfile)
     # Write our PID
     os.ftruncate(pidfile_fd, 0)
     os.write(pidfile_fd, str(os.getpid()).encode())
@@ -519,13 +574,42 @@ def singleton_check(pidfile="/tmp/kos.pid"):
     return pidfile_fd
 
 
+def lock_process_memory():
+    """Lock all current and future pages of the process into RAM.
+
+    Opt-in via KOS_MLOCKALL=1, since it applies to every thread for the life
+    of the process and needs CAP_IPC_LOCK or a large enough RLIMIT_MEMLOCK.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if libc.mlockall(MCL_CURRENT | MCL_FUTURE) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+    except (AttributeError, OSError) as e:
+        log.warning(f"Could not lock process memory, continuing without: {e}")
+        return False
+    log.info("Process memory locked")
+    return True
+
+
 def main():
     singleton_check()
     KOSLoggerSetup.setup(
         log_dir="logs", console_level=get_log_level(), file_level=logging.DEBUG
     )
+    if os.environ.get("KOS_MLOCKALL") == "1":
+        lock_process_memory()
+
+    try:
+        import uvloop
+
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None  # uvloop is optional, fall back to the default loop
 
-    asyncio.run(serve())
+    # Unix socket is opt-in, e.g. KOS_UNIX_SOCKET=/tmp/kos.sock
+    unix_socket = os.environ.get("KOS_UNIX_SOCKET") or None
+    asyncio.run(serve(unix_socket=unix_socket), loop_factory=loop_factory)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,20 @@
 import logging
 import os
 import sys
+import numpy as np
 from kos_zbot.provider import ModelProvider
 from kinfer.rust_bindings import PyModelRunner
 from kos_zbot.utils.logging import get_logger
 from kos_zbot.actuator import SCSMotorController
 from kos_zbot.imu import BNO055Manager
+from kos_zbot.utils.timer import PeriodicTimer
 #from kos_zbot.utils.latency import get_tracker
 import threading
 import time
 
+POLICY_CPU = 3  # Core 1 runs the actuator update loop
+POLICY_RT_PRIORITY = 80  # Below the actuator loop's SCHED_FIFO 99
+
 
 class PolicyManager:
     def __init__(
@@ -23,13 +28,24 @@ class PolicyManager:
         self.model_runner = None
         self.carry = None
 
+        # Zeroing command, built once: position 0 deg, velocity 0 (disables vmax)
+        self._zero_ids = np.array(
+            [
+                actuator_id
+                for actuator_id in self.model_provider.joint_to_actuator.values()
+                if actuator_id in self.actuator_controller.actuator_ids
+            ],
+            dtype=np.int32,
+        )
+        self._zero_targets = np.zeros(self._zero_ids.size)
+
         self.episode_length = (
             30.0  # Default episode length in seconds TODO: Move elsewhere, config file?
         )
         self.action_scale = 0.1  # Default action scale
 
         #self.latency_tracker = get_tracker("policy_loop")
-        self.stop_event = False
+        self.stop_event = threading.Event()
         self.task = None
         # TODO: Work on state feedback (this is a placeholder)
         self.state = {
@@ -40,27 +56,27 @@ class PolicyManager:
             "dry_run": "false",
         }
 
-    def _zero_all_joints(self):
-        """Move all joints back to zero position."""
+    def _zero_all_joints(self, tolerance: float = 1.0, timeout: float = 1.0):
+        """Move all joints back to zero position.
+
+        Returns once every joint is within `tolerance` degrees of zero or after
+        `timeout` seconds, whichever comes first.
+        """
         try:
-            # Create position commands for all actuators
-            position_commands = {}
-            for (
-                joint_name,
-                actuator_id,
-            ) in self.model_provider.joint_to_actuator.items():
-                if actuator_id in self.actuator_controller.actuator_ids:
-                    position_commands[actuator_id] = {
-                        "position": 0.0,  # Move to 0 degrees
-                        "velocity": 0.0,  # Disable vmax
-                    }
-
-            # Send commands to actuators
-            if position_commands:
+            if self._zero_ids.size:
                 self.log.info("Moving all joints to zero position")
-                self.actuator_controller.set_targets(position_commands)
-                # Wait a bit for the movement to complete
-                time.sleep(1.0)
+                self.actuator_controller.set_targets_array(
+                    self._zero_ids, self._zero_targets, self._zero_targets
+                )
+                # Poll until the joints arrive instead of waiting a fixed second
+                deadline = time.monotonic() + timeout
+                while time.monotonic() < deadline:
+                    time.sleep(0.02)
+                    positions, _, valid = self.actuator_controller.get_states(
+                        self._zero_ids
+                    )
+                    if valid.all() and np.abs(positions).max() < tolerance:
+                        break
         except Exception as e:
             self.log.error(f"Error zeroing joints: {e}")
 
@@ -101,7 +117,7 @@ class PolicyManager:
                     actuator_id, config
                 )
                 if success:
-                    self.log.info(
+                    self.log.debug(
                         f"Configured actuator {actuator_id} ({joint_name}) with kp={metadata['kp']}, kd={metadata['kd']}"
                     )
                 else:
@@ -114,11 +130,11 @@ class PolicyManager:
             self.model_runner = PyModelRunner(policy_file, self.model_provider)
             self.carry = self.model_runner.init()
 
-            self.stop_event = False
+            self.stop_event.clear()
             self.running = True
 
             # Run the policy in a separate thread to not block the event loop
-            self.thread = threading.Thread(target=self._run_policy)
+            self.thread = threading.Thread(target=self._run_policy, daemon=True)
             self.thread.start()
 
             #self.latency_tracker.reset()
@@ -135,7 +151,7 @@ class PolicyManager:
         if not self.running:
             return True
 
-        self.stop_event = True
+        self.stop_event.set()
         if hasattr(self, "thread"):
             self.thread.join()  # Wait for the policy thread to finish
 
@@ -147,7 +163,7 @@ class PolicyManager:
         return True
 
     async def get_state(self):
-        """Get the current policy state."""
+        """Get the current policy state. All values are already strings."""
         if not self.running:
             return {
                 "status": "stopped",
@@ -158,52 +174,73 @@ class PolicyManager:
             }
         return self.state
 
+    def _set_realtime(self):
+        """Pin the calling policy thread to its own core and raise it to SCHED_FIFO.
+
+        Core 1 is left to the actuator update loop and the UART IRQ, and the
+        priority stays below the actuator loop's so bus I/O is never starved.
+        """
+        try:
+            os.sched_setaffinity(0, {POLICY_CPU})
+            self.log.info(f"Policy loop running on CPUs: {sorted(os.sched_getaffinity(0))}")
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(POLICY_RT_PRIORITY))
+        except (AttributeError, PermissionError, OSError) as e:
+            self.log.warning(f"Could not set real-time priority for policy loop: {e}")
+
     def _run_policy(self):
         """Main policy execution loop with precise timing."""
+        self._set_realtime()
+        timer = None
         try:
-            import time
-
-            start_time = time.monotonic()  # Use monotonic time
-            period = 0.02  # 50Hz = 20ms period
-            next_deadline = start_time + period  # Initial deadline
-            period_ns = int(period * 1e9)
+            period_ns = 20_000_000  # 50Hz = 20ms period
+            episode_ns = int(self.episode_length * 1e9)
+            start_ns = time.monotonic_ns()  # Single monotonic timeline, no drift
+            timer = PeriodicTimer(period_ns)  # First tick one period from now
+
+            # Bind per-tick lookups once; the runner and provider are fixed for the episode
+            monotonic_ns = time.monotonic_ns
+            stop_is_set = self.stop_event.is_set
+            provider = self.model_provider
+            reset_values = provider.reset_values
+            provider.start_episode()
+            step = self.model_runner.step
+            take_action = self.model_runner.take_action
+            wait = timer.wait
+            carry = self.carry
             #self.latency_tracker.set_period(period_ns)
-            while not self.stop_event:
+            while not stop_is_set():
                 #self.latency_tracker.record_iteration()
                 # Check episode length
-                if time.monotonic() - start_time >= self.episode_length:
+                if monotonic_ns() - start_ns >= episode_ns:
                     self.log.info(
                         f"Episode length ({self.episode_length}s) reached, stopping policy"
                     )
-                    self.stop_event = True
+                    self.stop_event.set()
                     self._zero_all_joints()
                     break
 
-                # Clear arrays for this iteration
-                self.model_provider.arrays.clear()
+                # Reset arrays and start a new IMU snapshot for this iteration
+                reset_values()
+                provider.tick += 1
 
                 # Run one step of the model
-                output, self.carry = self.model_runner.step(self.carry)
+                output, carry = step(carry)
 
                 # Apply the output to the actuators
-                self.model_runner.take_action(output)
-
-                # Sleep until close to deadline
-                time.sleep(
-                    max(0, next_deadline - time.monotonic() - 0.001)
-                )  # Sleep until 1ms before deadline
-
-                # Busy wait for the final millisecond
-                while time.monotonic() < next_deadline:
-                    pass
+                take_action(output)
 
-                # Update deadline for next iteration
-                next_deadline += period
+                # Block until the next absolute tick; overruns skip ticks
+                # instead of shifting the phase of every later one
+                missed = wait() - 1
+                if missed:
+                    self.log.warning(f"Policy loop overran, missed {missed} tick(s)")
 
         except Exception as e:
             self.log.error(f"Policy execution error: {e}")
             raise
         finally:
+            if timer is not None:
+                timer.close()
             self.running = False
             self.model_runner = None
             self.carry = None
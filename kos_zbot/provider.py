@@ -1,3 +1,5 @@
+import math
+from types import MappingProxyType
 from typing import Sequence, cast
 import numpy as np
 from kinfer.rust_bindings import ModelProviderABC, PyModelMetadata
@@ -5,10 +7,13 @@ from abc import ABC, abstractmethod
 from kos_zbot.actuator import SCSMotorController
 from kos_zbot.imu import BNO055Manager
 from kos_zbot.utils.logging import get_logger
-from kos_zbot.utils.quat import rotate_vector_by_quat
+from kos_zbot.utils.quat import project_gravity
 from kos_zbot.utils.metadata import RobotMetadata
 import time
 
+DEG2RAD = math.pi / 180.0
+RAD2DEG = 180.0 / math.pi
+
 
 class InputState(ABC):
     """Abstract base class for input state management."""
@@ -68,6 +73,13 @@ class ControlVectorInputState(InputState):
             self.value[2] += self.STEP_SIZE
 
 class ModelProvider(ModelProviderABC):
+    """Feeds robot state to a kinfer model and applies its actions.
+
+    The arrays returned by the get_* methods are views into one preallocated
+    observation record that is overwritten every tick; callers that keep an
+    input past the current step must copy it.
+    """
+
     def __new__(cls, *args, **kwargs) -> "ModelProvider":
         self = cast(ModelProvider, super().__new__(cls))
         self.arrays = {}
@@ -85,6 +97,91 @@ class ModelProvider(ModelProviderABC):
         self.joint_to_actuator = metadata_manager.get_joint_to_actuator_mapping()
         self.log.info(f"Joint to actuator mapping: {self.joint_to_actuator}")
 
+        # get_inputs dispatch table, every getter takes the model's joint names
+        self._input_getters = {
+            "joint_angles": self.get_joint_angles,
+            "joint_angular_velocities": self.get_joint_angular_velocities,
+            "projected_gravity": lambda joint_names: self.get_projected_gravity(),
+            "accelerometer": lambda joint_names: self.get_accelerometer(),
+            "gyroscope": lambda joint_names: self.get_gyroscope(),
+            "command": lambda joint_names: self.get_command(),
+            "time": lambda joint_names: self.get_time(),
+        }
+        self._joint_ids_cache = {}
+        self._action_cache = {}
+
+        # One IMU snapshot per control tick, shared by every IMU-derived input.
+        # The policy loop advances `tick` before each model step.
+        self.tick = 0
+        self._snapshot_tick = -1
+        self._episode_start_ns = time.monotonic_ns()
+        self._obs_buf = None
+        self._layout(0)
+
+    def _layout(self, num_joints: int) -> None:
+        """Allocate the observation record for a policy with num_joints joints.
+
+        All inputs and the last action live in one contiguous structured
+        record; self.arrays maps each field name to a view into it. The record
+        is only reallocated when the joint count changes.
+        """
+        joints = (num_joints,)
+        dtype = np.dtype([
+            ("joint_angles", np.float32, joints),
+            ("joint_velocities", np.float32, joints),
+            ("action", np.float32, joints),
+            ("accelerometer", np.float32, (3,)),
+            ("gyroscope", np.float32, (3,)),
+            ("quaternion", np.float32, (4,)),
+            ("projected_gravity", np.float32, (3,)),
+            ("command", np.float32, (1,)),
+            ("time", np.float32, (1,)),
+        ], align=True)
+        obs_buf = np.zeros(1, dtype=dtype)
+        views = {name: obs_buf[name][0] for name in dtype.names}
+        if self._obs_buf is not None:
+            for name in ("accelerometer", "gyroscope", "quaternion", "projected_gravity", "command", "time"):
+                views[name][:] = self.arrays[name]
+
+        self._obs_buf = obs_buf
+        self.arrays = MappingProxyType(views)
+        # The IMU-derived getters return these views directly
+        self._accel = views["accelerometer"]
+        self._gyro = views["gyroscope"]
+        self._quat = views["quaternion"]
+        self._proj_g = views["projected_gravity"]
+        self._command = views["command"]
+        self._time = views["time"]
+
+    def _field(self, key: str, shape: tuple) -> np.ndarray:
+        """Observation record field for key, relaying the record out if shape changed."""
+        buf = self.arrays[key]
+        if buf.shape != shape:
+            self._layout(shape[0])
+            buf = self.arrays[key]
+        return buf
+
+    def _store(self, key: str, values) -> np.ndarray:
+        """Copy values into the observation record field for key and return it."""
+        buf = self._field(key, np.shape(values))
+        buf[:] = values
+        return buf
+
+    def _imu_snapshot(self) -> None:
+        """Read accel, gyro and quaternion in one locked IMU read for this tick."""
+        self.imu_manager.get_latest_values_into(self._accel, self._gyro, self._quat)
+        self._snapshot_tick = self.tick
+
+    def reset_values(self) -> None:
+        """Zero the observation record in place instead of dropping it."""
+        self._obs_buf[...] = 0
+
+    def start_episode(self) -> None:
+        """Restart the time input from zero.
+
+        Kept separate from reset_values, which the policy loops call every tick.
+        """
+        self._episode_start_ns = time.monotonic_ns()
 
     def get_inputs(self, input_types: Sequence[str], metadata: PyModelMetadata) -> dict[str, np.ndarray]:
             """Get inputs for the model based on the requested input types.
@@ -97,99 +194,73 @@ class ModelProvider(ModelProviderABC):
                 Dictionary mapping input type names to numpy arrays
             """
             inputs = {}
+            getters = self._input_getters
+            # Read the metadata property once; it crosses into Rust on every access
+            joint_names = metadata.joint_names  # type: ignore[attr-defined]
 
             for input_type in input_types:
-                if input_type == "joint_angles":
-                    inputs[input_type] = self.get_joint_angles(metadata.joint_names)  # type: ignore[attr-defined]
-                elif input_type == "joint_angular_velocities":
-                    inputs[input_type] = self.get_joint_angular_velocities(metadata.joint_names)  # type: ignore[attr-defined]
-                elif input_type == "projected_gravity":
-                    inputs[input_type] = self.get_projected_gravity()
-                elif input_type == "accelerometer":
-                    inputs[input_type] = self.get_accelerometer()
-                elif input_type == "gyroscope":
-                    inputs[input_type] = self.get_gyroscope()
-                elif input_type == "command":
-                    inputs[input_type] = self.get_command()
-                elif input_type == "time":
-                    inputs[input_type] = self.get_time()
-                else:
+                getter = getters.get(input_type)
+                if getter is None:
                     raise ValueError(f"Unknown input type: {input_type}")
+                inputs[input_type] = getter(joint_names)
 
             return inputs
       
+    def _joint_ids(self, joint_names: Sequence[str]) -> tuple:
+        """Actuator IDs in joint_names order, computed once per joint ordering."""
+        key = tuple(joint_names)
+        ids = self._joint_ids_cache.get(key)
+        if ids is None:
+            ids = tuple(self.joint_to_actuator[name] for name in key)
+            self._joint_ids_cache[key] = ids
+        return ids
+
     def get_joint_angles(self, joint_names: Sequence[str]) -> np.ndarray:
         """Get current joint angles from actuators in radians."""
-        angles = []
-        positions_log = {}
-        current_time = time.time()
-        for name in joint_names:
-            actuator_id = self.joint_to_actuator[name]
-            position = self.actuator_controller.get_position(actuator_id)
-            if position is None:
-                position = 0.0
-                self.log.error(f"Position for joint {name} is None")
-
-            positions_log[name] = {
-                "actuator_id": actuator_id,
-                "position_degrees": float(position)
-            }
-            angles.append(self.degrees_to_radians(float(position)))
-
-        angles_array = np.array(angles, dtype=np.float32)
-        self.arrays["joint_angles"] = angles_array
-        return angles_array
+        positions = self.actuator_controller.get_positions(self._joint_ids(joint_names))
+        missing = np.isnan(positions)
+        if missing.any():
+            for i in np.flatnonzero(missing).tolist():
+                self.log.error(f"Position for joint {joint_names[i]} is None")
+            positions[missing] = 0.0
+        out = self._field("joint_angles", positions.shape)
+        return np.multiply(positions, DEG2RAD, out=out)
 
     def get_joint_angular_velocities(self, joint_names: Sequence[str]) -> np.ndarray:
         """Get current joint velocities from actuators."""
-        velocities = []
-        for name in joint_names:
-            actuator_id = self.joint_to_actuator[name]
-            velocity = self.actuator_controller.get_velocity(actuator_id)
-            if velocity is None:
-                velocity = 0.0  # Default to 0 if velocity can't be read #TODO: Is this the right thing to do/
-                #self.log.error(f"Velocity for joint {name} is None")
-            velocities.append(self.degrees_to_radians(float(velocity)))
-
-        velocities_array = np.array(velocities, dtype=np.float32)
-        self.arrays["joint_velocities"] = velocities_array
-        return velocities_array
+        velocities = self.actuator_controller.get_velocities(self._joint_ids(joint_names))
+        # Default to 0 if velocity can't be read #TODO: Is this the right thing to do/
+        np.nan_to_num(velocities, copy=False, nan=0.0)
+        out = self._field("joint_velocities", velocities.shape)
+        return np.multiply(velocities, DEG2RAD, out=out)
 
     def get_projected_gravity(self) -> np.ndarray:
         """Get gravity vector in body frame using IMU quaternion."""
-        gravity = np.array([0, 0, -9.81], dtype=np.float32)  # Standard gravity vector
         quat = self.get_quaternion()
-        proj_gravity = rotate_vector_by_quat(gravity, quat, inverse=True)
-        #proj_gravity = np.array([0, 0, -9.80], dtype=np.float32)
-        self.arrays["projected_gravity"] = proj_gravity
-        return proj_gravity
+        return project_gravity(quat, out=self._proj_g)
 
     def get_accelerometer(self) -> np.ndarray:
         """Get accelerometer data from IMU."""
-        accel, _, _ = self.imu_manager.get_values()
-        acc_array = np.array(accel, dtype=np.float32)
-        self.arrays["accelerometer"] = acc_array
-        return acc_array
+        if self._snapshot_tick != self.tick:
+            self._imu_snapshot()
+        return self._accel
 
     def get_gyroscope(self) -> np.ndarray:
         """Get gyroscope data from IMU."""
-        _, gyro, _ = self.imu_manager.get_values()
-        gyro_array = np.array(gyro, dtype=np.float32)
-        self.arrays["gyroscope"] = gyro_array
-        return gyro_array
+        if self._snapshot_tick != self.tick:
+            self._imu_snapshot()
+        return self._gyro
 
     def get_quaternion(self) -> np.ndarray:
         """Get quaternion from IMU."""
-        w, x, y, z = self.imu_manager.get_quaternion()
-        quat = np.array([w, x, y, z], dtype=np.float32)
-        self.arrays["quaternion"] = quat
-        return quat
+        if self._snapshot_tick != self.tick:
+            self._imu_snapshot()
+        return self._quat
 
     def get_time(self) -> np.ndarray:
-        time = time.time()
-        time_array = np.array([time], dtype=np.float32)
-        self.arrays["time"] = time_array
-        return time_array
+        # Seconds since the episode started; small enough to stay precise in float32
+        self._time[0] = (time.monotonic_ns() - self._episode_start_ns) * 1e-9
+        return self._time
 
     def set_action_scale(self, scale: float):
         """Set the action scaling factor (0-1)."""
@@ -198,47 +269,59 @@ class ModelProvider(ModelProviderABC):
     @staticmethod
     def degrees_to_radians(degrees: float) -> float:
         """Convert degrees to radians."""
-        return degrees * (np.pi / 180.0)
+        return degrees * DEG2RAD
 
     @staticmethod
     def radians_to_degrees(radians: float) -> float:
         """Convert radians to degrees."""
-        return radians * (180.0 / np.pi)
+        return radians * RAD2DEG
 
     def get_command(self) -> np.ndarray:
         # No commands used for atm - return zeros
-        command_array = np.array([0.0], dtype=np.float32)
-        self.arrays["command"] = command_array
-        return command_array
+        self._command[0] = 0.0
+        return self._command
+
+    def _action_targets(self, joint_names: Sequence[str]) -> tuple:
+        """Actuator IDs, action indices and velocities for take_action.
+
+        Computed once per joint ordering; joints without a usable actuator are
+        reported here and left out of every later command.
+        """
+        key = tuple(joint_names)
+        cached = self._action_cache.get(key)
+        if cached is None:
+            ids, index = [], []
+            for i, name in enumerate(key):
+                if name not in self.joint_to_actuator:
+                    self.log.error(f"take_action: Invalid joint name: {name}")
+                    continue
+                actuator_id = self.joint_to_actuator[name]
+                if actuator_id not in self.actuator_controller.actuator_ids:
+                    self.log.error(
+                        f"take_action: actuator_id: {actuator_id} for joint: {name} not available"
+                    )
+                    continue
+                ids.append(actuator_id)
+                index.append(i)
+            cached = (
+                np.array(ids, dtype=np.int32),
+                np.array(index, dtype=np.intp),
+                np.full(len(ids), 286.0),
+            )
+            self._action_cache[key] = cached
+        return cached
 
     def take_action(self, action: np.ndarray, metadata: PyModelMetadata) -> None:
         """Send scaled position commands to actuators."""
         joint_names = metadata.joint_names  # type: ignore[attr-defined]
         assert action.shape == (len(joint_names),)
-        self.arrays["action"] = action
-        current_time = time.time()
-        position_commands = {}
-
-        for i, name in enumerate(joint_names):
-            if name not in self.joint_to_actuator:
-                self.log.error(f"take_action: Invalid joint name: {name}")
-                continue
-
-            actuator_id = self.joint_to_actuator[name]
-            scaled_position = self.radians_to_degrees(
-                float(action[i]) * self.action_scale
-            )
-
-            if actuator_id in self.actuator_controller.actuator_ids:
-                position_commands[actuator_id] = scaled_position
-            else:
-                self.log.error(
-                    f"take_action: actuator_id: {actuator_id} for joint: {name} not available"
-                )
-
-        if position_commands:
-            target_commands = {
-                aid: {"position": pos, "velocity": 286}
-                for aid, pos in position_commands.items()
-            }
-            self.actuator_controller.set_targets(target_commands)
\ No newline at end of file
+        if not np.isfinite(action).all():
+            # Never turn a diverged policy output into servo targets
+            raise ValueError(f"take_action: non-finite action {action}")
+        self._store("action", action)
+
+        ids, index, velocities = self._action_targets(joint_names)
+        if ids.size:
+            # Same float64 operation order as the scalar path, so counts match it
+            positions = action[index].astype(np.float64) * self.action_scale * RAD2DEG
+            self.actuator_controller.set_targets_array(ids, positions, velocities)
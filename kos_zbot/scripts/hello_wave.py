@@ -5,6 +5,7 @@ import signal
 from pykos import KOS
 import logging
 from kos_zbot.tests.kos_connection import kos_ready_async
+from kos_zbot.utils.timer import sleep_until_ns
 
 def get_logger(name):
     logger = logging.getLogger(name)
@@ -91,49 +92,48 @@ async def run_sine_test(
 
     t = np.arange(0, duration, 1 / sample_rate)
 
+    # Precompute every trajectory for the whole run, and one command dict per
+    # actuator that the loop updates in place
+    trajectories = []
+    if sync_all:
+        sync_positions = start_pos + amplitude * np.sin(2 * np.pi * frequency * t)
+        trajectories.append((valid_actuator_ids, sync_positions.tolist()))
+    else:
+        for pattern_name, pattern in wave_patterns.items():
+            pattern_amp = pattern.get("amplitude", amplitude)
+            pattern_freq = pattern.get("frequency", frequency)
+            pattern_phase = pattern.get("phase_offset", 0.0)
+            pattern_freq_mult = pattern.get("freq_multiplier", 1.0)
+            pattern_start = pattern.get("start_pos", start_pos)
+            pattern_pos_offset = pattern.get("position_offset", 0.0)
+
+            angle = 2 * np.pi * pattern_freq * pattern_freq_mult * t + np.deg2rad(pattern_phase)
+            positions = pattern_start + pattern_amp * np.sin(angle) + pattern_pos_offset
+            pattern_ids = [aid for aid in pattern["actuators"] if aid in valid_actuator_ids]
+            trajectories.append((pattern_ids, positions.tolist()))
+
+    command_groups = [
+        ([{"actuator_id": aid, "position": 0.0} for aid in ids], positions)
+        for ids, positions in trajectories
+    ]
+    commands = [cmd for cmds, _ in command_groups for cmd in cmds]
+
     log.info("running")
-    start_time = time.time()
+    start_ns = time.monotonic_ns()
 
     try:
-        for current_time in t:
+        for i, current_time in enumerate(t.tolist()):
             if interrupted:
                 break
 
-            commands = []
-
-            if sync_all:
-                for aid in valid_actuator_ids:
-                    angle = 2 * np.pi * frequency * current_time
-                    position = start_pos + amplitude * np.sin(angle)
-                    commands.append({"actuator_id": aid, "position": position})
-            else:
-                for pattern_name, pattern in wave_patterns.items():
-                    pattern_amp = pattern.get("amplitude", amplitude)
-                    pattern_freq = pattern.get("frequency", frequency)
-                    pattern_phase = pattern.get("phase_offset", 0.0)
-                    pattern_freq_mult = pattern.get("freq_multiplier", 1.0)
-                    pattern_start = pattern.get("start_pos", start_pos)
-                    pattern_pos_offset = pattern.get("position_offset", 0.0)
-
-                    for aid in pattern["actuators"]:
-                        if aid in valid_actuator_ids:
-                            angle = (
-                                2 * np.pi * pattern_freq * pattern_freq_mult * current_time
-                                + np.deg2rad(pattern_phase)
-                            )
-                            position = (
-                                pattern_start
-                                + pattern_amp * np.sin(angle)
-                                + pattern_pos_offset
-                            )
-                            commands.append({"actuator_id": aid, "position": position})
+            for cmds, positions in command_groups:
+                position = positions[i]
+                for cmd in cmds:
+                    cmd["position"] = position
 
             await kos.actuator.command_actuators(commands)
 
-            next_time = start_time + current_time
-            sleep_time = next_time - time.time()
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
+            await sleep_until_ns(start_ns + int(current_time * 1e9))
 
     except Exception as e:
         log.error(f"exception during test: {e}")
@@ -7,6 +7,7 @@ import logging
 
 from pykos import KOS
 from kos_zbot.tests.kos_connection import kos_ready_async
+from kos_zbot.utils.timer import sleep_until_ns
 
 """
 Does a salute script.
@@ -92,24 +93,19 @@ async def salute(
 
    # Hand squeezing   
     t = np.arange(0, squeeze_duration, 1 / squeeze_sample_rate)
+    positions = (squeeze_amplitude * np.sin(2 * np.pi * squeeze_freq * t)).tolist()
 
-    start_time = time.time()
+    start_ns = time.monotonic_ns()
 
     try:
-        for current_time in t:
+        for i, current_time in enumerate(t.tolist()):
             if interrupted:
                 break
             
-            angle = 2 * np.pi * squeeze_freq * current_time
-            position = squeeze_amplitude * np.sin(angle)
-            
-            command = [{"actuator_id": 24, "position": position}]
+            command = [{"actuator_id": 24, "position": positions[i]}]
             await kos.actuator.command_actuators(command)
         
-            next_time = start_time + current_time
-            sleep_time = next_time - time.time()
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
+            await sleep_until_ns(start_ns + int(current_time * 1e9))
         
     except KeyboardInterrupt:
         pass
@@ -5,11 +5,11 @@ Caution on orientations of motors.
 
 import asyncio
 import time
-import numpy as np
 import signal
 from pykos import KOS
 import logging
 from kos_zbot.tests.kos_connection import kos_ready_async
+from kos_zbot.utils.timer import sleep_until_ns
 
 def get_logger(name):
     logger = logging.getLogger(name)
@@ -117,27 +117,30 @@ async def overload(
     await kos.actuator.command_actuators(commands)
     await asyncio.sleep(2.0)
 
-    t = np.arange(0, duration, 1 / sample_rate)
+    # The hold targets never change, so the same command list is resent each tick
+    commands = [
+        {"actuator_id": aid, "position": apos}
+        for aid, apos in zip(valid_actuator_ids, valid_actuator_pos)
+    ]
 
     log.info("running")
-    start_time = time.time()
+    period_ns = int(1e9 / sample_rate)
+    next_ns = time.monotonic_ns()
+    end_ns = next_ns + int(duration * 1e9)
 
     try:
-        for current_time in t:
+        while next_ns < end_ns:
             if interrupted:
                 break
 
-            commands = []
-
-            for aid, apos in zip(valid_actuator_ids, valid_actuator_pos):
-                commands.append({"actuator_id": aid, "position": apos})
-
             await kos.actuator.command_actuators(commands)
 
-            next_time = start_time + current_time
-            sleep_time = next_time - time.time()
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
+            # Absolute monotonic deadlines; late ticks are skipped, not replayed
+            next_ns += period_ns
+            late_ns = time.monotonic_ns() - next_ns
+            if late_ns > 0:
+                next_ns += (late_ns // period_ns + 1) * period_ns
+            await sleep_until_ns(next_ns)
 
     except Exception as e:
         log.error(f"exception during test: {e}")
@@ -0,0 +1,41 @@
+import numpy as np
+
+from kos_zbot.utils.quat import GRAVITY_CARTESIAN, project_gravity, rotate_vector_by_quat
+
+
+def _random_inputs(n, dtype):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(n, 3)).astype(dtype)
+    quats = rng.normal(size=(n, 4)).astype(dtype)
+    return vectors, quats
+
+
+def test_batched_matches_single_vectors():
+    vectors, quats = _random_inputs(8, np.float64)
+
+    for inverse in (True, False):
+        batched = rotate_vector_by_quat(vectors, quats, inverse=inverse)
+        assert batched.shape == (8, 3)
+        for vector, quat, row in zip(vectors, quats, batched):
+            np.testing.assert_allclose(
+                row, rotate_vector_by_quat(vector, quat, inverse=inverse), rtol=1e-4, atol=1e-5
+            )
+
+
+def test_batched_keeps_input_dtype_and_leading_dims():
+    vectors, quats = _random_inputs(6, np.float64)
+
+    result = rotate_vector_by_quat(vectors.reshape(2, 3, 3), quats.reshape(2, 3, 4))
+
+    assert result.dtype == np.float64
+    assert result.shape == (2, 3, 3)
+
+
+def test_batched_quats_broadcast_single_vector():
+    _, quats = _random_inputs(5, np.float32)
+
+    result = rotate_vector_by_quat(GRAVITY_CARTESIAN, quats)
+
+    assert result.shape == (5, 3)
+    for quat, row in zip(quats, result):
+        np.testing.assert_allclose(row, project_gravity(quat), rtol=1e-4, atol=1e-4)
@@ -0,0 +1,66 @@
+import logging
+import threading
+
+import numpy as np
+
+from kos_zbot.actuator import COUNTS_PER_DEGREE, SCSMotorController
+
+
+def _controller(registered=(11, 12, 13)):
+    """Bare controller with just the state set_targets_array touches."""
+    ctrl = SCSMotorController.__new__(SCSMotorController)
+    ctrl.log = logging.getLogger("test_set_targets_array")
+    ctrl._target_positions_lock = threading.Lock()
+    ctrl.next_position_batch = None
+    ctrl.next_velocity_batch = None
+    ctrl.commanded_ids = set()
+    ctrl._registered_lut = np.zeros(256, dtype=bool)
+    ctrl._registered_lut[list(registered)] = True
+    ctrl._min_angle_lut = np.full(256, -np.inf)
+    ctrl._max_angle_lut = np.full(256, np.inf)
+    ctrl.actuator_limits = {}
+    return ctrl
+
+
+def test_non_finite_targets_are_not_written():
+    ctrl = _controller()
+    ids = np.array([11, 12, 13], dtype=np.int32)
+    positions = np.array([10.0, np.nan, np.inf])
+    velocities = np.array([5.0, 5.0, 5.0])
+
+    rejected = ctrl.set_targets_array(ids, positions, velocities)
+
+    assert rejected == [12, 13]
+    assert ctrl.next_position_batch == {11: int((10.0 + 180.0) * COUNTS_PER_DEGREE)}
+    assert set(ctrl.next_velocity_batch) == {11}
+    assert ctrl.commanded_ids == {11}
+
+
+def test_non_finite_velocity_is_not_written():
+    ctrl = _controller()
+    ids = np.array([11, 12], dtype=np.int32)
+
+    rejected = ctrl.set_targets_array(ids, np.array([0.0, 0.0]), np.array([-np.inf, np.nan]))
+
+    assert rejected == [11, 12]
+
+    assert not ctrl.next_position_batch
+    assert not ctrl.commanded_ids
+
+
+def test_clipped_position_names_the_limit(caplog):
+    ctrl = _controller()
+    ctrl._min_angle_lut[11] = -30.0
+    ctrl._max_angle_lut[12] = 45.0
+    ctrl.actuator_limits = {11: {"joint_name": "left_hip"}, 12: {"joint_name": "right_hip"}}
+
+    with caplog.at_level(logging.WARNING):
+        rejected = ctrl.set_targets_array(
+            np.array([11, 12], dtype=np.int32), np.array([-90.0, 90.0]), np.zeros(2)
+        )
+
+    assert rejected == []
+    assert "(min limit)" in caplog.text
+    assert "(max limit)" in caplog.text
+    assert ctrl.next_position_batch[11] == int((-30.0 + 180.0) * COUNTS_PER_DEGREE)
+    assert ctrl.next_position_batch[12] == int((45.0 + 180.0) * COUNTS_PER_DEGREE)
@@ -63,7 +63,7 @@ async def actuator_move(ids, target, velocity=None, kp=None, kd=None, accelerati
     timed_out = False
 
     while time.time() - start_time < wait:
-        resp = await kos.actuator.get_actuators_state()
+        resp = await kos.actuator.get_actuators_state(actuator_ids)
         id_to_state = {s.actuator_id: s for s in resp.states}
         
         all_settled = True
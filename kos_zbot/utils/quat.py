@@ -1,13 +1,75 @@
 """ Functions for interacting with Quaternions """
 
+import math
+
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernels also run as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
 GRAVITY_CARTESIAN = np.array([0, 0, -9.81], dtype=np.float32)  # Standard gravity vector
+_GRAVITY_Z = float(GRAVITY_CARTESIAN[2])
+
+# The kernels are compiled eagerly for the one signature the control loop uses,
+# so no type dispatch or JIT compile happens on the first tick.
 
 
-def rotate_vector_by_quat(vector: np.ndarray, quat: np.ndarray, inverse: bool = True, eps: float = 1e-6) -> np.ndarray:
-    """Rotates a vector by a quaternion."""
-    # Keep existing quaternion rotation implementation
+@njit(
+    "float32[:](float64, float64, float64, float64, float64, float64, float64, boolean, float64, float32[:])",
+    cache=True,
+    fastmath=True,
+)
+def _rotate_vec_quat_scalar(qw, qx, qy, qz, vx, vy, vz, inverse, eps, out):
+    """Rotate (vx, vy, vz) by the normalized quaternion (qw, qx, qy, qz) into out."""
+    inv_norm = 1.0 / math.sqrt(qw * qw + qx * qx + qy * qy + qz * qz + eps)  # rsqrt under fastmath
+    w = qw * inv_norm
+    x = qx * inv_norm
+    y = qy * inv_norm
+    z = qz * inv_norm
+
+    if inverse:
+        x, y, z = -x, -y, -z
+
+    out[0] = (
+        w * w * vx
+        + 2 * y * w * vz
+        - 2 * z * w * vy
+        + x * x * vx
+        + 2 * y * x * vy
+        + 2 * z * x * vz
+        - z * z * vx
+        - y * y * vx
+    )
+    out[1] = (
+        2 * x * y * vx
+        + y * y * vy
+        + 2 * z * y * vz
+        + 2 * w * z * vx
+        - z * z * vy
+        + w * w * vy
+        - 2 * w * x * vz
+        - x * x * vy
+    )
+    out[2] = (
+        2 * x * z * vx
+        + 2 * y * z * vy
+        + z * z * vz
+        - 2 * w * y * vx
+        + w * w * vz
+        + 2 * w * x * vy
+        - y * y * vz
+        - x * x * vz
+    )
+    return out
+
+
+def _rotate_vec_quat_batched(vector: np.ndarray, quat: np.ndarray, inverse: bool, eps: float) -> np.ndarray:
+    """Vectorized rotation for (..., 3) vectors and (..., 4) quaternions, keeping the input dtype."""
     quat = quat / (np.linalg.norm(quat, axis=-1, keepdims=True) + eps)
     w, x, y, z = np.split(quat, 4, axis=-1)
 
@@ -51,3 +113,59 @@ def rotate_vector_by_quat(vector: np.ndarray, quat: np.ndarray, inverse: bool =
 
     return np.concatenate([xx, yy, zz], axis=-1)
 
+
+def rotate_vector_by_quat(vector: np.ndarray, quat: np.ndarray, inverse: bool = True, eps: float = 1e-6, out: np.ndarray = None) -> np.ndarray:
+    """Rotates vectors by (w, x, y, z) quaternions.
+
+    Batched (..., 3) / (..., 4) inputs take the vectorized NumPy path and keep
+    the input dtype. A single vector and quaternion use the scalar kernel and
+    return float32, written into out when a preallocated float32[3] is given.
+    """
+    vector = np.asarray(vector)
+    quat = np.asarray(quat)
+    if vector.ndim > 1 or quat.ndim > 1:
+        result = _rotate_vec_quat_batched(vector, quat, inverse, eps)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+    if out is None:
+        out = np.empty(3, dtype=np.float32)
+    qw, qx, qy, qz = quat
+    vx, vy, vz = vector
+    return _rotate_vec_quat_scalar(
+        float(qw), float(qx), float(qy), float(qz),
+        float(vx), float(vy), float(vz),
+        bool(inverse), float(eps), out,
+    )
+
+
+@njit(
+    "float32[:](float64, float64, float64, float64, float64, float64, float32[:])",
+    cache=True,
+    fastmath=True,
+)
+def _project_gravity_scalar(qw, qx, qy, qz, g, eps, out):
+    """Inverse-rotate (0, 0, g) by the normalized quaternion (qw, qx, qy, qz) into out.
+
+    Every term is quadratic in the quaternion, so normalizing reduces to one
+    division by the squared norm and no square root is needed.
+    """
+    s = g / (qw * qw + qx * qx + qy * qy + qz * qz + eps)
+
+    out[0] = 2 * s * (qx * qz - qw * qy)
+    out[1] = 2 * s * (qy * qz + qw * qx)
+    out[2] = s * (qw * qw - qx * qx - qy * qy + qz * qz)
+    return out
+
+
+def project_gravity(quat: np.ndarray, eps: float = 1e-6, out: np.ndarray = None) -> np.ndarray:
+    """Gravity in the body frame, same as rotate_vector_by_quat(GRAVITY_CARTESIAN, quat, inverse=True)."""
+    if out is None:
+        out = np.empty(3, dtype=np.float32)
+    qw, qx, qy, qz = quat
+    return _project_gravity_scalar(
+        float(qw), float(qx), float(qy), float(qz),
+        _GRAVITY_Z, float(eps), out,
+    )
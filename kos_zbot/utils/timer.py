@@ -0,0 +1,109 @@
+""" Periodic timer for fixed-rate control loops """
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import sys
+import time
+
+CLOCK_MONOTONIC = 1
+TFD_CLOEXEC = 0o2000000
+TFD_TIMER_ABSTIME = 1
+TIMER_ABSTIME = 1
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _Itimerspec(ctypes.Structure):
+    _fields_ = [("it_interval", _Timespec), ("it_value", _Timespec)]
+
+
+def _timespec(ns: int) -> _Timespec:
+    return _Timespec(ns // 1_000_000_000, ns % 1_000_000_000)
+
+
+def _load_libc():
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+_has_timerfd = _libc is not None and hasattr(_libc, "timerfd_create")
+_has_nanosleep = _libc is not None and hasattr(_libc, "clock_nanosleep")
+
+
+class PeriodicTimer:
+    """Fixed-period timer on the CLOCK_MONOTONIC timeline.
+
+    On Linux this arms a kernel timerfd with an absolute first deadline and a
+    fixed interval, so ticks never drift and missed ticks are reported by the
+    kernel. Without timerfd it sleeps with clock_nanosleep(TIMER_ABSTIME) on
+    absolute monotonic deadlines, and as a last resort sleeps then spins.
+    """
+
+    SPIN_NS = 100_000  # busy-wait window for the fallback path
+
+    def __init__(self, period_ns: int):
+        self.period_ns = period_ns
+        self._fd = None
+        self._next_deadline = time.monotonic_ns() + period_ns
+
+        if _has_timerfd:
+            fd = _libc.timerfd_create(CLOCK_MONOTONIC, TFD_CLOEXEC)
+            if fd >= 0:
+                spec = _Itimerspec(_timespec(period_ns), _timespec(self._next_deadline))
+                if _libc.timerfd_settime(fd, TFD_TIMER_ABSTIME, ctypes.byref(spec), None) == 0:
+                    self._fd = fd
+                else:
+                    os.close(fd)
+
+    def wait(self) -> int:
+        """Block until the next tick.
+
+        Returns:
+            Number of periods elapsed since the previous wait (1 when on time)
+        """
+        if self._fd is not None:
+            return int.from_bytes(os.read(self._fd, 8), sys.byteorder)
+
+        if _has_nanosleep:
+            deadline = _timespec(self._next_deadline)
+            # Absolute deadline, so a signal interruption just resumes the wait
+            while _libc.clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, ctypes.byref(deadline), None) == errno.EINTR:
+                pass
+        else:
+            # Sleep until close to the deadline, then spin for the remainder
+            sleep_ns = self._next_deadline - time.monotonic_ns() - self.SPIN_NS
+            if sleep_ns > 0:
+                time.sleep(sleep_ns / 1e9)
+            while time.monotonic_ns() < self._next_deadline:
+                pass
+
+        expirations = 1 + (time.monotonic_ns() - self._next_deadline) // self.period_ns
+        self._next_deadline += expirations * self.period_ns
+        return expirations
+
+    def close(self):
+        """Release the kernel timer."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+async def sleep_until_ns(deadline_ns: int, spin_ns: int = 1_000_000):
+    """Asynchronously sleep until a time.monotonic_ns() deadline.
+
+    Event loop timers can overshoot by milliseconds, so the loop sleep stops
+    spin_ns early and the remainder is busy-waited.
+    """
+    sleep_ns = deadline_ns - time.monotonic_ns() - spin_ns
+    if sleep_ns > 0:
+        await asyncio.sleep(sleep_ns / 1e9)
+    while time.monotonic_ns() < deadline_ns:
+        pass
@@ -13,7 +13,6 @@ setup(
         'grpcio',
         'pykos>=0.7.10',
         'adafruit-circuitpython-bno055',
-        'psutil',
         'tabulate',
         'tqdm',
         'numpy',
@@ -30,6 +29,10 @@ setup(
         'kscale>=0.3.16',
         'kinfer'
     ],
+    extras_require={
+        'uvloop': ['uvloop'],
+        'numba': ['numba'],
+    },
     entry_points={
         'console_scripts': [
             'kos=kos_zbot.cli:cli',